@@ -0,0 +1,467 @@
+import argparse
+import glob
+import hashlib
+import html
+import os
+import re
+import shutil
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import fitz
+
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from utils import parse_filename
+from build_trace import traced
+
+"""
+Builds the bagrut topic and aggregate PDFs from cached per-question fragments instead of compiling each document in full.
+
+Every bagrut_questions/<subject>/*.tex is compiled once per variant (regular / sols) into a standalone PDF fragment,
+cached under out/.fragments/ and keyed by a hash of the question, its scans and the preamble. The topic and aggregate
+documents generated by create_questions_index.py are then assembled by merging fragments with PyMuPDF; the table of
+contents, bookmarks and page numbers are generated in the merge step. The first question of each \\section is compiled
+with the section heading above it (a separate cached fragment), so the aggregate documents keep their visible topic breaks.
+
+Usage: python scripts/bagrut_questions/build_fragments.py [--jobs N] [--subject SUBJECT]
+
+Example: python scripts/bagrut_questions/create_questions_index.py && python scripts/bagrut_questions/build_fragments.py
+"""
+
+# -------------------------------
+# CONFIGURATION
+# -------------------------------
+SRC_DIR = "src"
+OUT_DIR = "out"
+QUESTIONS_DIR = "bagrut_questions"
+PREAMBLE = "scripts/tex_preamble.tex"
+# Must be three levels below the repo root so the questions' ../../../ paths resolve from the output directory.
+FRAGMENTS_DIR = os.path.join(OUT_DIR, ".fragments")
+COVERS_SUBDIR = "covers"
+
+# variant name -> (output suffix, xelatex definitions); same flags as the Makefile's regular and sols rules
+VARIANTS = {
+    "regular": ("", "\\def\\setdetailed{\\detailedtrue} \\def\\setwithsols{\\withsolsfalse}"),
+    "sols": ("_sols", "\\def\\setdetailed{\\detailedtrue} \\def\\setwithsols{\\withsolstrue}"),
+}
+
+# Page numbers are stamped in the merge step, so fragments print an empty \thepage.
+FRAGMENT_TEMPLATE = """\\documentclass[14pt]{extarticle}
+\\input{../../../scripts/tex_preamble.tex}
+\\renewcommand{\\thepage}{}
+
+\\begin{document}
+[[HEADING]]\\input{../../../bagrut_questions/[[SUBJECT]]/[[STEM]].tex}
+\\end{document}
+"""
+
+# Numbered like the aggregate documents' \section headings
+HEADING_TEMPLATE = "\\setcounter{section}{[[NUMBER]]}\n\\section{[[TITLE]]}\n"
+
+COVER_TEMPLATE = """\\documentclass[14pt]{extarticle}
+\\input{../../../scripts/tex_preamble.tex}
+\\renewcommand{\\thepage}{}
+\\title{[[TITLE]]}
+
+\\begin{document}
+\\maketitle
+\\end{document}
+"""
+
+TOC_TITLE = "جدول المحتويات"
+# The TOC is laid out line by line: title right-aligned (RTL), page number left-aligned, level 2 indented.
+TOC_MARGIN = 60
+TOC_HEADING_HEIGHT = 50
+TOC_LINE_HEIGHT = 22
+TOC_NUMBER_WIDTH = 40
+TOC_INDENT = 20
+TOC_FONTSIZE = 12
+TOC_SECTION_FONTSIZE = 14
+# Amiri (the pandoc/markdown font) is looked up in these directories; MuPDF's built-in Arabic font is used if missing.
+AMIRI_FONT_FILES = {"regular": "Amiri-Regular.ttf", "bold": "Amiri-Bold.ttf"}
+FONT_DIRS = ["/usr/share/fonts", "/usr/local/share/fonts", os.path.expanduser("~/.fonts"),
+             os.path.expanduser("~/.local/share/fonts"), "C:/Windows/Fonts"]
+TOC_CSS = """
+@font-face { font-family: Amiri; src: url([[REGULAR]]); }
+@font-face { font-family: Amiri; font-weight: bold; src: url([[BOLD]]); }
+* { font-family: Amiri, sans-serif; font-size: [[SIZE]]pt; margin: 0; }
+h1 { font-size: 18pt; text-align: center; }
+p { text-align: start; }
+p.section { font-size: [[SECTION_SIZE]]pt; font-weight: bold; }
+"""
+PAGE_SIZE = (595, 842)  # A4 in points, as set by the preamble's geometry
+PAGE_NUMBER_FONTSIZE = 11
+
+# Paths of files a question pulls in (scans, pdf pages), used in the fragment cache key.
+REFERENCED_PATH_PATTERN = re.compile(r"\{\s*(\.\./\.\./\.\./[^{}\s]+)\s*\}")
+INPUT_PATTERN = re.compile(r"\\input\{\.\./\.\./\.\./bagrut_questions/([^/{}]+)/([^/{}]+)\.tex\}")
+SECTION_PATTERN = re.compile(r"\\section\{(.+)\}")
+TITLE_PATTERN = re.compile(r"\\title\{(.+)\}")
+LATEX_ESCAPE_PATTERN = re.compile(r"\\([&%$#_])")
+LATEX_COMMAND_PATTERN = re.compile(r"\\[a-zA-Z]+\*?\s*")
+AUX_EXTENSIONS = [".aux", ".log", ".out", ".toc", ".pyg", ".tex"]
+# -------------------------------
+
+
+def sha256_file(path, digest):
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+
+
+def fragment_source(subject, stem, heading=None):
+    """LaTeX source of a question fragment; `heading` is (number, title) for the first question of a section."""
+    heading_tex = ""
+    if heading:
+        number, title = heading
+        heading_tex = HEADING_TEMPLATE.replace("[[NUMBER]]", str(number - 1)).replace("[[TITLE]]", title)
+    return (FRAGMENT_TEMPLATE.replace("[[HEADING]]", heading_tex)
+            .replace("[[SUBJECT]]", subject).replace("[[STEM]]", stem))
+
+
+def fragment_hash(subject, stem, variant, heading=None):
+    """Cache key of a question fragment: its source, preamble, variant flags, the question and every file it references."""
+    digest = hashlib.sha256()
+    digest.update(fragment_source(subject, stem, heading).encode("utf-8"))
+    digest.update(VARIANTS[variant][1].encode("utf-8"))
+    sha256_file(PREAMBLE, digest)
+
+    tex_path = os.path.join(QUESTIONS_DIR, subject, f"{stem}.tex")
+    sha256_file(tex_path, digest)
+    with open(tex_path, "r", encoding="utf-8", errors="ignore") as f:
+        content = f.read()
+    for rel_path in sorted(set(REFERENCED_PATH_PATTERN.findall(content))):
+        # ../../../ is relative to a directory three levels deep, i.e. the repo root
+        path = os.path.normpath(rel_path[len("../../../"):])
+        digest.update(rel_path.encode("utf-8"))
+        if os.path.isfile(path):
+            sha256_file(path, digest)
+    return digest.hexdigest()[:16]
+
+
+def cover_hash(title, variant):
+    digest = hashlib.sha256()
+    digest.update(COVER_TEMPLATE.replace("[[TITLE]]", title).encode("utf-8"))
+    digest.update(VARIANTS[variant][1].encode("utf-8"))
+    sha256_file(PREAMBLE, digest)
+    return digest.hexdigest()[:16]
+
+
+def compile_tex(tex_content, output_dir, jobname, variant):
+    """Write `tex_content` to <output_dir>/<jobname>.tex and compile it once with xelatex. Returns the pdf path or None."""
+    os.makedirs(output_dir, exist_ok=True)
+    tex_path = os.path.join(output_dir, f"{jobname}.tex")
+    with open(tex_path, "w", encoding="utf-8") as f:
+        f.write(tex_content)
+
+    env = dict(os.environ, TEXMF_OUTPUT_DIRECTORY=output_dir)
+    command = [
+        "xelatex", "-shell-escape", "-interaction=nonstopmode", "-halt-on-error",
+        f"-output-directory={output_dir}", f"-jobname={jobname}",
+        f"{VARIANTS[variant][1]} \\input{{{tex_path}}}",
+    ]
+    result = subprocess.run(command, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+
+    pdf_path = os.path.join(output_dir, f"{jobname}.pdf")
+    if result.returncode != 0 or not os.path.exists(pdf_path):
+        tail = result.stdout.decode("utf-8", errors="ignore").splitlines()[-15:]
+        print(f"  Error compiling {tex_path}:\n    " + "\n    ".join(tail))
+        if os.path.exists(pdf_path):
+            os.remove(pdf_path)
+        return None
+
+    for ext in AUX_EXTENSIONS:
+        aux_path = os.path.join(output_dir, f"{jobname}{ext}")
+        if os.path.exists(aux_path):
+            os.remove(aux_path)
+    shutil.rmtree(os.path.join(output_dir, f"_minted-{jobname}"), ignore_errors=True)
+    return pdf_path
+
+
+def build_fragment(subject, stem, variant, heading=None):
+    """Return the cached fragment pdf for a question (with a section heading above it), compiling it if its hash changed."""
+    output_dir = os.path.join(FRAGMENTS_DIR, subject)
+    prefix = f"{stem}__section{heading[0]}__{variant}__" if heading else f"{stem}__{variant}__"
+    jobname = prefix + fragment_hash(subject, stem, variant, heading)
+    pdf_path = os.path.join(output_dir, f"{jobname}.pdf")
+    if os.path.exists(pdf_path):
+        return pdf_path, False
+
+    # Drop fragments of older versions of this question
+    for old_path in glob.glob(os.path.join(output_dir, glob.escape(prefix) + "*.pdf")):
+        os.remove(old_path)
+
+    return compile_tex(fragment_source(subject, stem, heading), output_dir, jobname, variant), True
+
+
+def build_cover(title, variant):
+    output_dir = os.path.join(FRAGMENTS_DIR, COVERS_SUBDIR)
+    jobname = f"cover__{variant}__{cover_hash(title, variant)}"
+    pdf_path = os.path.join(output_dir, f"{jobname}.pdf")
+    if os.path.exists(pdf_path):
+        return pdf_path, False
+    return compile_tex(COVER_TEMPLATE.replace("[[TITLE]]", title), output_dir, jobname, variant), True
+
+
+def parse_document(tex_path):
+    """
+    Parse a generated topic/aggregate file into (titles, items).
+    titles: {"sols": ..., "regular": ...}; items: ("section", title) or ("question", subject, stem), in order.
+    """
+    with open(tex_path, "r", encoding="utf-8") as f:
+        content = f.read()
+
+    # The generated files define the sols title first (\ifwithsols), then the regular one (\else)
+    found = TITLE_PATTERN.findall(content)
+    titles = {"sols": found[0], "regular": found[-1]} if found else {"sols": "", "regular": ""}
+
+    items = []
+    body = content.split("\\begin{document}", 1)[-1]
+    for line in body.splitlines():
+        line = line.strip()
+        if line.startswith("%"):
+            continue
+        section = SECTION_PATTERN.search(line)
+        if section:
+            items.append(("section", section.group(1)))
+            continue
+        for subject, stem in INPUT_PATTERN.findall(line):
+            items.append(("question", subject, stem))
+    return titles, items
+
+
+def fragment_keys(items):
+    """
+    Return the fragment key (subject, stem, heading) of every question item, in order.
+    The first question after a section carries heading (number, title); all other questions have heading None.
+    """
+    keys = []
+    heading = None
+    number = 0
+    for item in items:
+        if item[0] == "section":
+            number += 1
+            heading = (number, item[1])
+            continue
+        keys.append((item[1], item[2], heading))
+        heading = None
+    return keys
+
+
+def plain_text(latex):
+    """Strip simple LaTeX markup (\&, \textbf{...}) from a section title for the TOC and bookmarks."""
+    text = LATEX_ESCAPE_PATTERN.sub(r"\1", latex)
+    text = LATEX_COMMAND_PATTERN.sub("", text)
+    return text.replace("{", "").replace("}", "").replace("~", " ").strip()
+
+
+def question_title(stem):
+    """Same wording as the subsection titles in the question files."""
+    _, year, model, qnum, _ = parse_filename(f"{stem}.pdf")
+    if year == "UNKNOWN":
+        return stem
+    return f"سؤال {qnum} امتحان {model} سنة {year}"
+
+
+def uses_importpdfpage(subject, stem):
+    with open(os.path.join(QUESTIONS_DIR, subject, f"{stem}.tex"), "r", encoding="utf-8", errors="ignore") as f:
+        return "\\importpdfpage" in f.read()
+
+
+def find_amiri_fonts():
+    """Return {"regular": path, "bold": path} for the Amiri font files, or None if Amiri is not installed."""
+    found = {}
+    for font_dir in FONT_DIRS:
+        for root, _, files in os.walk(font_dir):
+            for key, name in AMIRI_FONT_FILES.items():
+                if name in files and key not in found:
+                    found[key] = os.path.join(root, name)
+    if "regular" not in found:
+        return None
+    found.setdefault("bold", found["regular"])
+    return found
+
+
+def toc_style():
+    """Return (css, archive) for the TOC html boxes, embedding Amiri when it is installed."""
+    css = TOC_CSS.replace("[[SIZE]]", str(TOC_FONTSIZE)).replace("[[SECTION_SIZE]]", str(TOC_SECTION_FONTSIZE))
+    fonts = find_amiri_fonts()
+    if not fonts:
+        print("  Amiri font not found, the table of contents uses MuPDF's default Arabic font")
+        css = "\n".join(line for line in css.splitlines() if not line.startswith("@font-face"))
+        return css, None
+
+    archive = fitz.Archive()
+    for path in set(fonts.values()):
+        archive.add(os.path.dirname(path))
+    css = css.replace("[[REGULAR]]", os.path.basename(fonts["regular"])).replace("[[BOLD]]", os.path.basename(fonts["bold"]))
+    return css, archive
+
+
+def toc_pages(entries):
+    """Split entries into per-page chunks; the first page also holds the heading."""
+    usable = PAGE_SIZE[1] - 2 * TOC_MARGIN
+    first_capacity = int((usable - TOC_HEADING_HEIGHT) // TOC_LINE_HEIGHT)
+    capacity = int(usable // TOC_LINE_HEIGHT)
+    chunks = [entries[:first_capacity]]
+    rest = entries[first_capacity:]
+    while rest:
+        chunks.append(rest[:capacity])
+        rest = rest[capacity:]
+    return chunks
+
+
+def toc_page_count(entries):
+    return len(toc_pages(entries))
+
+
+def insert_toc_pages(doc, entries, at_page, style):
+    """Insert printed table of contents pages at `at_page`. entries: (level, title, page_number)."""
+    css, archive = style
+    left = TOC_MARGIN
+    right = PAGE_SIZE[0] - TOC_MARGIN
+    for i, chunk in enumerate(toc_pages(entries)):
+        page = doc.new_page(at_page + i, width=PAGE_SIZE[0], height=PAGE_SIZE[1])
+        y = TOC_MARGIN
+        if i == 0:
+            page.insert_htmlbox(fitz.Rect(left, y, right, y + TOC_HEADING_HEIGHT),
+                                f"<h1>{TOC_TITLE}</h1>", css=css, archive=archive)
+            y += TOC_HEADING_HEIGHT
+
+        for level, title, page_number in chunk:
+            indent = TOC_INDENT * (level - 1)
+            css_class = "section" if level == 1 else "question"
+            # The title starts at the right margin (indented for questions), the number sits on the left.
+            # The box is taller than a line so insert_htmlbox never shrinks the text to fit.
+            page.insert_htmlbox(fitz.Rect(left + TOC_NUMBER_WIDTH, y, right - indent, y + 2 * TOC_LINE_HEIGHT),
+                                f'<p dir="rtl" class="{css_class}">{html.escape(title)}</p>', css=css, archive=archive)
+            # Same class and box top as the title, so the number shares its baseline
+            page.insert_htmlbox(fitz.Rect(left, y, left + TOC_NUMBER_WIDTH, y + 2 * TOC_LINE_HEIGHT),
+                                f'<p class="{css_class}">{page_number}</p>', css=css, archive=archive)
+            y += TOC_LINE_HEIGHT
+
+
+def drop_empty_sections(items):
+    """Remove sections with no questions after them (they would point past their content or the document's end)."""
+    kept = []
+    for i, item in enumerate(items):
+        if item[0] == "section" and (i + 1 == len(items) or items[i + 1][0] == "section"):
+            continue
+        kept.append(item)
+    return kept
+
+
+def merge_document(output_path, title_cover, items, fragments, style):
+    """
+    Merge the cover, TOC pages and question fragments into `output_path` with bookmarks and page numbers.
+    `items` must already be passed through drop_empty_sections, `fragments` maps fragment_keys to pdf paths.
+    """
+    doc = fitz.open()
+    with fitz.open(title_cover) as cover:
+        doc.insert_pdf(cover)
+    cover_pages = doc.page_count
+    toc_page_total = toc_page_count(items)
+
+    # Page numbers are known up front: cover + TOC pages come first
+    bookmarks = []
+    toc_entries = []
+    unnumbered = set()
+    keys = iter(fragment_keys(items))
+    for item in items:
+        page_number = doc.page_count + toc_page_total + 1
+        if item[0] == "section":
+            bookmarks.append([1, plain_text(item[1]), page_number])
+            toc_entries.append((1, plain_text(item[1]), page_number))
+            continue
+
+        key = next(keys)
+        _, subject, stem = item
+        level = 2 if any(b[0] == 1 for b in bookmarks) else 1
+        bookmarks.append([level, question_title(stem), page_number])
+        toc_entries.append((level, question_title(stem), page_number))
+        if uses_importpdfpage(subject, stem):
+            unnumbered.add(page_number - 1)  # \importpdfpage sets \thispagestyle{empty}
+        with fitz.open(fragments[key]) as fragment:
+            doc.insert_pdf(fragment)
+
+    insert_toc_pages(doc, toc_entries, cover_pages, style)
+
+    for index in range(cover_pages, doc.page_count):
+        if index in unnumbered:
+            continue
+        page = doc[index]
+        text = str(index + 1)
+        width = fitz.get_text_length(text, fontsize=PAGE_NUMBER_FONTSIZE)
+        page.insert_text(
+            ((page.rect.width - width) / 2, page.rect.height - 40), text, fontsize=PAGE_NUMBER_FONTSIZE
+        )
+
+    doc.set_toc([[1, TOC_TITLE, cover_pages + 1]] + bookmarks)
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    # Every TOC html box embeds its own copy of the font: subset them and let garbage=4 merge the identical streams
+    doc.subset_fonts()
+    doc.save(output_path, garbage=4, deflate=True)
+    doc.close()
+
+
+@traced("fragments")
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build bagrut topic/aggregate PDFs by merging cached per-question fragments."
+    )
+    parser.add_argument("--jobs", type=int, default=os.cpu_count(), help="Parallel xelatex jobs (default: CPU count)")
+    parser.add_argument("--subject", help="Only build this subject (default: all under src/*/bagrut_questions)")
+    args = parser.parse_args()
+
+    documents = sorted(glob.glob(os.path.join(SRC_DIR, args.subject or "*", "bagrut_questions", "*.tex")))
+    if not documents:
+        print("No topic files found, run create_questions_index.py first.")
+        return
+
+    parsed = {}
+    for tex_path in documents:
+        titles, items = parse_document(tex_path)
+        parsed[tex_path] = (titles, drop_empty_sections(items))
+    # Headings are None or tuples, which don't compare: sort plain fragments first
+    questions = sorted({key for _, items in parsed.values() for key in fragment_keys(items)},
+                       key=lambda k: (k[0], k[1], k[2] or (0, "")))
+    print(f"Found {len(documents)} document(s) using {len(questions)} question fragment(s)")
+
+    style = toc_style()
+    failed = False
+    for variant, (suffix, _) in VARIANTS.items():
+        print(f"\n--- Variant: {variant} ---")
+        with ThreadPoolExecutor(max_workers=args.jobs) as executor:
+            fragment_jobs = {q: executor.submit(build_fragment, q[0], q[1], variant, q[2]) for q in questions}
+            titles = {doc_titles[variant] for doc_titles, _ in parsed.values()}
+            cover_jobs = {t: executor.submit(build_cover, t, variant) for t in titles}
+        fragments = {q: job.result()[0] for q, job in fragment_jobs.items()}
+        covers = {t: job.result()[0] for t, job in cover_jobs.items()}
+        compiled = sum(1 for job in fragment_jobs.values() if job.result()[1])
+        print(f"  Compiled {compiled} fragment(s), {len(questions) - compiled} cached")
+
+        for tex_path, (doc_titles, items) in parsed.items():
+            rel_dir = os.path.dirname(os.path.relpath(tex_path, SRC_DIR))
+            name = os.path.splitext(os.path.basename(tex_path))[0]
+            output_path = os.path.join(OUT_DIR, rel_dir, f"{name}{suffix}.pdf")
+
+            missing = [f"{key[0]}/{key[1]}" for key in fragment_keys(items) if not fragments[key]]
+            cover = covers[doc_titles[variant]]
+            if not cover:
+                missing.append("cover")
+            if missing:
+                print(f"  Skipping {output_path}: failed fragments {', '.join(missing)}")
+                failed = True
+                continue
+
+            merge_document(output_path, cover, items, fragments, style)
+            print(f"  Merged {output_path}")
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
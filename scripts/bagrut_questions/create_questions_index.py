@@ -20,7 +20,9 @@ OUT_DIR = "out"
 # -------------------------------
 
 sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 from utils import parse_filename
+from build_trace import traced
 
 
 # Ordered topic config and Arabic section titles for aggregate files.
@@ -237,6 +239,13 @@ def generate_html(rows, folders_set, topics_set, models_set, years_set, total_qu
     print(f"HTML Index written to {html_output_file}")
 
 
+def index_outputs():
+    """The files main() writes: the CSV/HTML indexes and the generated topic/aggregate files."""
+    return (glob.glob(os.path.join(OUT_DIR, "*", "bagrut_questions", "questions_index.*"))
+            + glob.glob(os.path.join(SRC_DIR, "*", "bagrut_questions", "*.tex")))
+
+
+@traced("index", output=index_outputs)
 def main():
     # Parse command line arguments
     parser = argparse.ArgumentParser(
@@ -1,9 +1,13 @@
 import os
+import sys
 import fitz
 import numpy as np
 from pdf2image import convert_from_path
 from PIL import Image, ImageEnhance
 
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from build_trace import traced
+
 """
 Splits PDF files into individual pages or converts PDFs to cropped images.
 
@@ -46,6 +50,7 @@ def crop_bottom_white(image, tolerance=245, crop_lines=-1):
     cropped_image = image.crop((0, 0, image.width, last_row))
     return cropped_image
 
+@traced("pdf-to-images", output=lambda output_folder, **_: output_folder)
 def pdf_to_images(pdf_path, output_folder='pages', dpi=300, crop=False, crop_twice=False):
     os.makedirs(output_folder, exist_ok=True)
     pages = convert_from_path(pdf_path, dpi=dpi)
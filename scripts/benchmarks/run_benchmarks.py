@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Benchmarks the scripts/ tooling on synthetic trees of several sizes and compares runs.
+
+Benchmarks:
+  index       create_questions_index.main (CSV/HTML index + topic/aggregate files)
+  references  create_questions_index.is_used over a sample of question names
+  rename      rename_file.main (scan and rewrite references in every .tex)
+  dedup       clean.remove_duplicates over out/
+  render      split_pdf_to_pages.pdf_to_images and crop_bottom_pdf (needs PyMuPDF, pdf2image, Pillow, numpy)
+
+Usage: python scripts/benchmarks/run_benchmarks.py run [--scales small,medium] [--repeat N] [--output results.json]
+Usage: python scripts/benchmarks/run_benchmarks.py compare <baseline.json> <current.json> [--threshold PERCENT] [--min-delta SECONDS]
+
+Example: python scripts/benchmarks/run_benchmarks.py run --output out/benchmarks/before.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+SCRIPTS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, SCRIPTS_DIR)
+sys.path.insert(0, os.path.join(SCRIPTS_DIR, "bagrut_questions"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import clean
+import create_questions_index
+import rename_file
+from synthetic_corpus import generate_corpus, write_outputs
+
+SCALES = {
+    "small": {"questions": 500, "tex_files": 100, "pdfs": 1, "pages": 4},
+    "medium": {"questions": 2000, "tex_files": 500, "pdfs": 2, "pages": 8},
+    "large": {"questions": 10000, "tex_files": 2000, "pdfs": 4, "pages": 16},
+}
+DEFAULT_SCALES = "small,medium"
+REFERENCE_SAMPLE = 50
+RENDER_DPI = 100
+
+
+@contextlib.contextmanager
+def in_directory(path, argv=None):
+    """Run with `path` as cwd (the scripts use cwd-relative paths), a fake argv and stdout silenced."""
+    old_cwd, old_argv = os.getcwd(), sys.argv
+    os.chdir(path)
+    sys.argv = argv or [sys.argv[0]]
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            yield
+    finally:
+        os.chdir(old_cwd)
+        sys.argv = old_argv
+
+
+def time_runs(func, repeat, setup=None):
+    """Call `func` `repeat` times (after `setup`, untimed) and return the durations in seconds."""
+    durations = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def bench_index(corpus_dir, corpus, repeat):
+    def run():
+        with in_directory(corpus_dir, ["create_questions_index.py"]):
+            create_questions_index.main()
+    return time_runs(run, repeat)
+
+
+def bench_references(corpus_dir, corpus, repeat):
+    names = [os.path.splitext(os.path.basename(q))[0] for q in corpus["questions"][:REFERENCE_SAMPLE]]
+
+    def run():
+        with in_directory(corpus_dir):
+            for name in names:
+                create_questions_index.is_used(name)
+    return time_runs(run, repeat)
+
+
+def bench_rename(corpus_dir, corpus, repeat):
+    old_name = os.path.splitext(os.path.basename(corpus["questions"][0]))[0]
+    new_name = old_name + "_renamed"
+
+    def run():
+        with in_directory(corpus_dir, ["rename_file.py", old_name, new_name]):
+            rename_file.main()
+        with in_directory(corpus_dir, ["rename_file.py", new_name, old_name]):
+            rename_file.main()
+
+    # Each run renames and then renames back so the tree is unchanged; report half as the cost of one rename.
+    return [d / 2 for d in time_runs(run, repeat)]
+
+
+def bench_dedup(corpus_dir, corpus, repeat):
+    out_dir = os.path.join(corpus_dir, "out")
+    tex_paths = [os.path.relpath(p, "src") for p in corpus["tex_files"]]
+
+    def setup():
+        shutil.rmtree(out_dir, ignore_errors=True)
+        write_outputs(corpus_dir, tex_paths, random.Random(0))
+
+    def run():
+        with in_directory(corpus_dir):
+            clean.remove_duplicates("out")
+    return time_runs(run, repeat, setup)
+
+
+def bench_render(corpus_dir, corpus, repeat):
+    try:
+        import split_pdf_to_pages
+    except ImportError as e:
+        print(f"  Skipping render benchmark: {e}")
+        return None
+
+    pages_dir = os.path.join(corpus_dir, "pages")
+
+    def setup():
+        shutil.rmtree(pages_dir, ignore_errors=True)
+
+    def run():
+        with in_directory(corpus_dir):
+            for pdf in corpus["pdfs"]:
+                split_pdf_to_pages.pdf_to_images(pdf, output_folder=pages_dir, dpi=RENDER_DPI, crop=True)
+                split_pdf_to_pages.crop_bottom_pdf(pdf, output_folder=pages_dir, crop=True)
+    return time_runs(run, repeat, setup)
+
+
+BENCHMARKS = {
+    "index": bench_index,
+    "references": bench_references,
+    "rename": bench_rename,
+    "dedup": bench_dedup,
+    "render": bench_render,
+}
+
+
+def run_benchmarks(scales, benchmarks, repeat, keep=False):
+    """Generate a corpus per scale, run the selected benchmarks on it and return the results dict."""
+    results = {}
+    for scale in scales:
+        params = SCALES[scale]
+        corpus_dir = tempfile.mkdtemp(prefix=f"bench_{scale}_")
+        print(f"Scale {scale}: {params} -> {corpus_dir}")
+        try:
+            start = time.perf_counter()
+            corpus = generate_corpus(corpus_dir, **params)
+            print(f"  Generated corpus in {time.perf_counter() - start:.2f}s")
+
+            for name in benchmarks:
+                durations = BENCHMARKS[name](corpus_dir, corpus, repeat)
+                if durations is None:
+                    continue
+                results[f"{name}@{scale}"] = {
+                    "benchmark": name,
+                    "scale": scale,
+                    "params": params,
+                    "runs": durations,
+                    "min": min(durations),
+                    "median": statistics.median(durations),
+                }
+                print(f"  {name:<12} median {statistics.median(durations):.3f}s  min {min(durations):.3f}s")
+        finally:
+            if not keep:
+                shutil.rmtree(corpus_dir, ignore_errors=True)
+    return results
+
+
+def compare(baseline, current, threshold, min_delta=0.0):
+    """
+    Print per-benchmark changes of the median and return the keys that regressed by more than `threshold` %.
+    Changes smaller than `min_delta` seconds are never flagged (timer noise on millisecond benchmarks).
+    """
+    regressions = []
+    print(f"{'benchmark':<24}{'baseline':>12}{'current':>12}{'change':>10}")
+    for key in sorted(set(baseline) | set(current)):
+        if key not in baseline or key not in current:
+            print(f"{key:<24}{'only in ' + ('current' if key in current else 'baseline'):>34}")
+            continue
+        old, new = baseline[key]["median"], current[key]["median"]
+        change = (new - old) / old * 100 if old else 0.0
+        flag = ""
+        if change > threshold and new - old > min_delta:
+            flag = "  REGRESSION"
+            regressions.append(key)
+        print(f"{key:<24}{old:>11.3f}s{new:>11.3f}s{change:>+9.1f}%{flag}")
+    return regressions
+
+
+def load_results(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)["results"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the scripts/ tooling on synthetic corpora.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Run benchmarks and store results as JSON")
+    run_parser.add_argument("--scales", default=DEFAULT_SCALES,
+                            help=f"Comma separated scales from {', '.join(SCALES)} (default: {DEFAULT_SCALES})")
+    run_parser.add_argument("--benchmarks", default=",".join(BENCHMARKS),
+                            help=f"Comma separated benchmarks (default: {','.join(BENCHMARKS)})")
+    run_parser.add_argument("--repeat", type=int, default=3, help="Runs per benchmark (default: 3)")
+    run_parser.add_argument("--output", default="out/benchmarks/results.json",
+                            help="Results file (default: out/benchmarks/results.json)")
+    run_parser.add_argument("--keep", action="store_true", help="Keep the generated corpora")
+
+    compare_parser = subparsers.add_parser("compare", help="Compare two results files")
+    compare_parser.add_argument("baseline", help="Baseline results JSON")
+    compare_parser.add_argument("current", help="Current results JSON")
+    compare_parser.add_argument("--threshold", type=float, default=10.0,
+                                help="Flag medians slower by more than this percentage (default: 10)")
+    compare_parser.add_argument("--min-delta", type=float, default=0.01,
+                                help="Ignore slowdowns smaller than this many seconds (default: 0.01)")
+
+    args = parser.parse_args()
+
+    if args.command == "compare":
+        regressions = compare(load_results(args.baseline), load_results(args.current), args.threshold, args.min_delta)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) above {args.threshold}%: {', '.join(regressions)}")
+            sys.exit(1)
+        print("\nNo regressions.")
+        return
+
+    scales = args.scales.split(",")
+    benchmarks = args.benchmarks.split(",")
+    for name, known in [(s, SCALES) for s in scales] + [(b, BENCHMARKS) for b in benchmarks]:
+        if name not in known:
+            parser.error(f"Unknown name '{name}', choose from: {', '.join(known)}")
+
+    results = run_benchmarks(scales, benchmarks, args.repeat, args.keep)
+
+    output_dir = os.path.dirname(args.output)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({
+            "meta": {
+                "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "repeat": args.repeat,
+            },
+            "results": results,
+        }, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
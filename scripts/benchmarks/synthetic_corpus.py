@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Generates a synthetic project tree for benchmarking the scripts/ tooling.
+
+The tree mirrors the real layout:
+  bagrut_questions/<subject>/<topic>_<year>_<model>_<qnum>.<ext>  (+ .tex solutions for some)
+  bagrut_questions/exams/<year>-<model>.pdf                        (multi-page PDFs)
+  src/<subject>/exs/*.tex                                          (files \\input-ing the questions)
+  out/<subject>/exs/*.pdf, *_sols.pdf, *_printable.pdf             (build outputs, some duplicates)
+
+Usage: python scripts/benchmarks/synthetic_corpus.py <target_dir> [--questions N] [--tex-files N] [--pdfs N] [--pages N]
+
+Example: python scripts/benchmarks/synthetic_corpus.py /tmp/corpus --questions 10000 --tex-files 2000
+"""
+import argparse
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "bagrut_questions"))
+from utils import parse_filename
+
+SUBJECT_TOPICS = {
+    "basics": ["if", "loops_for", "loops_while", "strings", "arrays", "arrays2D", "classes1", "classes2"],
+    "computational_models": ["languages", "dfa", "nfa", "regularity", "irregularity", "pda", "turing"],
+}
+MODELS = ["899222", "899222b", "899205", "899381", "899381a", "899381b", "899371"]
+YEARS = [str(y) for y in range(2000, 2026)]
+QUESTION_NUMBERS = [str(n) for n in range(1, 13)]
+QUESTION_EXTENSIONS = ["png", "jpg", "pdf"]
+
+SOLUTION_TEMPLATE = """\\subsection*{{سؤال {qnum} امتحان {model} سنة {year}}}
+\\addcontentsline{{toc}}{{subsection}}{{سؤال {qnum} امتحان {model} سنة {year}}}
+
+\\noindent
+\\makebox[\\textwidth][c]{{\\includegraphics[width=0.9\\paperwidth,keepaspectratio]{{ ../../../bagrut_questions/{subject}/{filename} }}%
+}}%
+
+\\ifwithsols
+\\begin{{boxSolution}}[سؤال {qnum} امتحان {model} سنة {year}]
+{body}
+\\end{{boxSolution}}
+\\clearpage
+\\fi
+"""
+
+REFERENCING_TEX_TEMPLATE = """\\documentclass[14pt]{{extarticle}}
+\\input{{../../../scripts/tex_preamble.tex}}
+
+\\title{{تمارين {index}}}
+
+\\begin{{document}}
+\\maketitle
+
+{body}
+
+\\end{{document}}
+"""
+
+FILLER_PARAGRAPH = "\\begin{question}\nاكتب برنامجاً يقرأ عدداً صحيحاً ويطبع مجموع أرقامه.\n\\end{question}\n"
+
+
+def question_filenames(count, rng):
+    """Return `count` unique question file names following <topic>_<year>_<model>_<qnum>.<ext>, per subject."""
+    combos = [
+        (subject, topic, year, model, qnum)
+        for subject, topics in SUBJECT_TOPICS.items()
+        for topic in topics
+        for year in YEARS
+        for model in MODELS
+        for qnum in QUESTION_NUMBERS
+    ]
+    if count > len(combos):
+        raise ValueError(f"At most {len(combos)} unique questions can be generated, got {count}")
+
+    rng.shuffle(combos)
+    result = []
+    for subject, topic, year, model, qnum in combos[:count]:
+        filename = f"{topic}_{year}_{model}_{qnum}.{rng.choice(QUESTION_EXTENSIONS)}"
+        assert parse_filename(filename)[0] != "UNKNOWN", filename
+        result.append((subject, filename))
+    return result
+
+
+def write_pdf(path, pages, text="Synthetic page"):
+    """Write a minimal valid multi-page PDF (Helvetica text only) without third-party libraries."""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for i in range(pages):
+        lines = "".join(f"BT /F1 14 Tf 72 {760 - 20 * row} Td ({text} {i + 1} line {row + 1}) Tj ET\n" for row in range(30))
+        objects.append(f"<< /Length {len(lines)} >>\nstream\n{lines}endstream")
+        content_id = len(objects)
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>"
+        )
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {pages} >>"
+
+    data = b"%PDF-1.4\n"
+    offsets = []
+    for i, obj in enumerate(objects):
+        offsets.append(len(data))
+        data += f"{i + 1} 0 obj\n{obj}\nendobj\n".encode("latin-1")
+    xref_offset = len(data)
+    data += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    for offset in offsets:
+        data += f"{offset:010d} 00000 n \n".encode("latin-1")
+    data += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode("latin-1")
+
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def write_questions(base_dir, questions, rng):
+    """Write question scans (placeholder bytes) and .tex solutions for ~70% of them (some still TODO)."""
+    for subject, filename in questions:
+        folder = os.path.join(base_dir, "bagrut_questions", subject)
+        os.makedirs(folder, exist_ok=True)
+        with open(os.path.join(folder, filename), "wb") as f:
+            f.write(os.urandom(rng.randint(2_000, 20_000)))
+
+        if rng.random() < 0.7:
+            topic, year, model, qnum, _ = parse_filename(filename)
+            body = "// TODO:" if rng.random() < 0.2 else "\\begin{minted}{csharp}\nint x = 0;\n\\end{minted}"
+            tex_path = os.path.join(folder, os.path.splitext(filename)[0] + ".tex")
+            with open(tex_path, "w", encoding="utf-8") as f:
+                f.write(SOLUTION_TEMPLATE.format(
+                    qnum=qnum, model=model, year=year, subject=subject, filename=filename, body=body
+                ))
+
+
+def write_referencing_tex(base_dir, questions, count, rng):
+    """Write `count` src/<subject>/exs/*.tex documents, each \\input-ing a few questions. Returns their rel paths."""
+    paths = []
+    for i in range(count):
+        subject = rng.choice(list(SUBJECT_TOPICS))
+        candidates = [q for s, q in questions if s == subject] or [q for _, q in questions]
+        referenced = rng.sample(candidates, min(len(candidates), rng.randint(1, 8)))
+        body = [FILLER_PARAGRAPH * rng.randint(5, 40)]
+        for filename in referenced:
+            stem = os.path.splitext(filename)[0]
+            body.append(f"\\input{{../../../bagrut_questions/{subject}/{stem}.tex}}")
+
+        folder = os.path.join(base_dir, "src", subject, "exs")
+        os.makedirs(folder, exist_ok=True)
+        rel_path = os.path.join(subject, "exs", f"ex{i:05d}-synthetic.tex")
+        with open(os.path.join(base_dir, "src", rel_path), "w", encoding="utf-8") as f:
+            f.write(REFERENCING_TEX_TEMPLATE.format(index=i, body="\n".join(body)))
+        paths.append(rel_path)
+    return paths
+
+
+def write_outputs(base_dir, tex_paths, rng):
+    """Write out/ PDFs for each document: regular, _sols and _printable, about half of them near-duplicates."""
+    for rel_path in tex_paths:
+        stem = os.path.splitext(os.path.join(base_dir, "out", rel_path))[0]
+        os.makedirs(os.path.dirname(stem), exist_ok=True)
+        size = rng.randint(20_000, 200_000)
+        for suffix in ["", "_sols", "_printable"]:
+            variant_size = size + rng.randint(0, 150) if rng.random() < 0.5 else size + rng.randint(1_000, 50_000)
+            with open(f"{stem}{suffix}.pdf", "wb") as f:
+                f.write(b"\0" * variant_size)
+
+
+def write_exam_pdfs(base_dir, count, pages):
+    """Write `count` multi-page exam PDFs. Returns their paths."""
+    folder = os.path.join(base_dir, "bagrut_questions", "exams")
+    os.makedirs(folder, exist_ok=True)
+    paths = []
+    for i in range(count):
+        path = os.path.join(folder, f"{YEARS[-1 - i % len(YEARS)]}-{MODELS[i % len(MODELS)]}-{i}.pdf")
+        write_pdf(path, pages, text=f"Exam {i}")
+        paths.append(path)
+    return paths
+
+
+def generate_corpus(base_dir, questions=500, tex_files=100, pdfs=1, pages=4, seed=0):
+    """Generate the whole tree under `base_dir` and return a summary dict of what was written."""
+    rng = random.Random(seed)
+    question_names = question_filenames(questions, rng)
+    write_questions(base_dir, question_names, rng)
+    tex_paths = write_referencing_tex(base_dir, question_names, tex_files, rng)
+    write_outputs(base_dir, tex_paths, rng)
+    pdf_paths = write_exam_pdfs(base_dir, pdfs, pages)
+    return {
+        "questions": [os.path.join("bagrut_questions", s, f) for s, f in question_names],
+        "tex_files": [os.path.join("src", p) for p in tex_paths],
+        "pdfs": pdf_paths,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic corpus for benchmarking.")
+    parser.add_argument("target_dir", help="Directory to generate the tree in")
+    parser.add_argument("--questions", type=int, default=500, help="Number of question files (default: 500)")
+    parser.add_argument("--tex-files", type=int, default=100, help="Number of referencing .tex files (default: 100)")
+    parser.add_argument("--pdfs", type=int, default=1, help="Number of multi-page exam PDFs (default: 1)")
+    parser.add_argument("--pages", type=int, default=4, help="Pages per exam PDF (default: 4)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    args = parser.parse_args()
+
+    summary = generate_corpus(args.target_dir, args.questions, args.tex_files, args.pdfs, args.pages, args.seed)
+    print(f"Generated {len(summary['questions'])} questions, {len(summary['tex_files'])} tex files "
+          f"and {len(summary['pdfs'])} PDFs in {args.target_dir}")
+
+
+if __name__ == "__main__":
+    main()
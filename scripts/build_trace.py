@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+"""
+Records per-target build timings and exports them as a Chrome trace plus a summary table.
+
+Tracing is enabled by setting BUILD_TRACE to a directory (the Makefile does this for `make TRACE=1`).
+Every traced step appends one JSON line to $BUILD_TRACE/events.jsonl.
+
+Usage: python scripts/build_trace.py run --target <target> --phase <phase> [--log <xelatex.log>] -- <command...>
+Usage: python scripts/build_trace.py report [--top N]
+
+Example: make all TRACE=1 && make trace-report
+"""
+import argparse
+import functools
+import inspect
+import json
+import os
+import re
+import resource
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+TRACE_ENV = "BUILD_TRACE"
+EVENTS_FILE = "events.jsonl"
+CHROME_TRACE_FILE = "trace.json"
+SUMMARY_FILE = "summary.txt"
+
+# xelatex (xdvipdfmx) logs "File: <path> Graphic file (type ...)", pdftex logs "<path>" / "<use path>".
+LOG_IMAGE_PATTERNS = [
+    re.compile(r"^File: (\S+\.(?:png|jpe?g|pdf)) Graphic file", re.IGNORECASE | re.MULTILINE),
+    re.compile(r"<(?:use )?([^<>\s]+\.(?:png|jpe?g|pdf))>", re.IGNORECASE),
+]
+# TeX wraps .log lines at max_print_line characters (79 by default)
+LOG_LINE_WIDTH = 79
+
+
+def trace_dir():
+    """Return the active trace directory, or None when tracing is disabled."""
+    return os.environ.get(TRACE_ENV) or None
+
+
+def path_size(path):
+    """Size in bytes of a file, of all files under a directory, or the total of a list of paths. None if missing."""
+    if isinstance(path, (list, tuple)):
+        sizes = [s for s in map(path_size, path) if s is not None]
+        return sum(sizes) if sizes else None
+    if not path or not os.path.exists(path):
+        return None
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    total = 0
+    for root, _, files in os.walk(path):
+        for f in files:
+            total += os.path.getsize(os.path.join(root, f))
+    return total
+
+
+def record_event(event):
+    """Append one event to the events file (a single write so parallel make jobs don't interleave)."""
+    directory = trace_dir()
+    if not directory:
+        return
+    os.makedirs(directory, exist_ok=True)
+    line = json.dumps(event, ensure_ascii=False) + "\n"
+    with open(os.path.join(directory, EVENTS_FILE), "a", encoding="utf-8") as f:
+        f.write(line)
+
+
+def parse_log_images(log_path):
+    """Return [(image_path, size_in_bytes)] for the images an xelatex .log says were included."""
+    if not log_path or not os.path.isfile(log_path):
+        return []
+
+    with open(log_path, "r", encoding="utf-8", errors="ignore") as f:
+        lines = f.read().splitlines()
+
+    # Join wrapped lines: a line of exactly LOG_LINE_WIDTH characters continues on the next one
+    unwrapped = []
+    continued = False
+    for line in lines:
+        if continued:
+            unwrapped[-1] += line
+        else:
+            unwrapped.append(line)
+        continued = len(line) == LOG_LINE_WIDTH
+    content = "\n".join(unwrapped)
+
+    base_dir = os.path.dirname(log_path)
+    images = {}
+    for pattern in LOG_IMAGE_PATTERNS:
+        for match in pattern.finditer(content):
+            path = match.group(1)
+            # Relative paths are resolved from the output directory (TEXMF_OUTPUT_DIRECTORY), or from cwd.
+            resolved = os.path.normpath(os.path.join(base_dir, path))
+            if not os.path.isfile(resolved):
+                resolved = os.path.normpath(path)
+            images[resolved] = path_size(resolved) or 0
+    return sorted(images.items())
+
+
+def traced(phase, output=None):
+    """
+    Decorator recording wall time, CPU time and peak RSS of a Python function when tracing is enabled.
+    `output` is a file/directory (or a list of them) whose size is recorded after the call. It can also be a function
+    called with the decorated function's arguments by name (defaults applied) that returns the path(s).
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        def output_paths(args, kwargs):
+            if not callable(output):
+                return output
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return output(**bound.arguments)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not trace_dir():
+                return func(*args, **kwargs)
+
+            module = func.__module__
+            if module == "__main__":
+                module = os.path.splitext(os.path.basename(sys.argv[0]))[0]
+
+            start = time.time()
+            cpu_start = time.process_time()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                end = time.time()
+                record_event({
+                    "target": f"{module}.{func.__name__}",
+                    "phase": phase,
+                    "start": start,
+                    "end": end,
+                    "cpu": time.process_time() - cpu_start,
+                    "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                    "output_size": path_size(output_paths(args, kwargs)),
+                    "pid": os.getpid(),
+                })
+        return wrapper
+    return decorator
+
+
+def run_command(target, phase, command, log_path=None):
+    """Run `command` (leading NAME=VALUE words are treated as environment, like env(1)) and record it."""
+    env = dict(os.environ)
+    while command and re.match(r"^[A-Za-z_][A-Za-z0-9_]*=", command[0]):
+        name, value = command.pop(0).split("=", 1)
+        env[name] = value
+
+    if not command:
+        print("build_trace: no command given", file=sys.stderr)
+        return 2
+
+    start = time.time()
+    try:
+        proc = subprocess.Popen(command, env=env)
+    except OSError as e:
+        # Fail like the shell would (command not found), but still record the step
+        print(f"build_trace: {command[0]}: {e.strerror}", file=sys.stderr)
+        record_event({
+            "target": target,
+            "phase": phase,
+            "start": start,
+            "end": time.time(),
+            "cpu": 0.0,
+            "max_rss_kb": 0,
+            "output_size": path_size(target),
+            "pid": os.getpid(),
+            "exit_code": 127,
+        })
+        return 127
+    # wait4 gives the rusage of this child (and what it waited for) only, so parallel jobs don't mix.
+    _, status, usage = os.wait4(proc.pid, 0)
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    end = time.time()
+
+    event = {
+        "target": target,
+        "phase": phase,
+        "start": start,
+        "end": end,
+        "cpu": usage.ru_utime + usage.ru_stime,
+        "max_rss_kb": usage.ru_maxrss,
+        "output_size": path_size(target),
+        "pid": proc.pid,
+        "exit_code": proc.returncode,
+    }
+    if log_path:
+        event["images"] = parse_log_images(log_path)
+    record_event(event)
+    return proc.returncode
+
+
+def load_events(directory):
+    events_path = os.path.join(directory, EVENTS_FILE)
+    if not os.path.exists(events_path):
+        return []
+    events = []
+    with open(events_path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                events.append(json.loads(line))
+    return events
+
+
+def assign_lanes(events):
+    """Greedily pack events into lanes so overlapping (parallel) steps land on different rows."""
+    lane_ends = []
+    lanes = []
+    for event in sorted(events, key=lambda e: e["start"]):
+        for i, lane_end in enumerate(lane_ends):
+            if lane_end <= event["start"]:
+                lane_ends[i] = event["end"]
+                lanes.append((event, i))
+                break
+        else:
+            lane_ends.append(event["end"])
+            lanes.append((event, len(lane_ends) - 1))
+    return lanes
+
+
+def build_chrome_trace(events):
+    """Convert events to the Chrome trace event format (load in chrome://tracing or ui.perfetto.dev)."""
+    if not events:
+        return {"traceEvents": [], "displayTimeUnit": "ms"}
+
+    origin = min(e["start"] for e in events)
+    trace_events = []
+    for event, lane in assign_lanes(events):
+        trace_events.append({
+            "name": f"{event['phase']} {event['target']}",
+            "cat": event["phase"],
+            "ph": "X",
+            "ts": round((event["start"] - origin) * 1e6),
+            "dur": round((event["end"] - event["start"]) * 1e6),
+            "pid": 1,
+            "tid": lane,
+            "args": {
+                "target": event["target"],
+                "cpu_s": round(event.get("cpu") or 0, 3),
+                "max_rss_kb": event.get("max_rss_kb"),
+                "output_size": event.get("output_size"),
+                "exit_code": event.get("exit_code"),
+                "images": len(event.get("images", [])),
+            },
+        })
+    return {"traceEvents": trace_events, "displayTimeUnit": "ms"}
+
+
+def format_size(num_bytes):
+    if num_bytes is None:
+        return "-"
+    for unit in ["B", "KB", "MB"]:
+        if num_bytes < 1024:
+            return f"{num_bytes:.0f}{unit}"
+        num_bytes /= 1024
+    return f"{num_bytes:.1f}GB"
+
+
+def format_table(headers, rows):
+    widths = [max(len(str(x)) for x in column) for column in zip(headers, *rows)]
+    lines = ["  ".join(str(h).ljust(w) for h, w in zip(headers, widths))]
+    lines.append("  ".join("-" * w for w in widths))
+    for row in rows:
+        lines.append("  ".join(str(c).ljust(w) for c, w in zip(row, widths)))
+    return "\n".join(lines)
+
+
+def build_summary(events, top=20):
+    """Return a text report of the slowest targets, phases and the heaviest images seen in xelatex logs."""
+    if not events:
+        return "No trace events recorded."
+
+    wall_total = max(e["end"] for e in events) - min(e["start"] for e in events)
+    sections = [f"Traced {len(events)} steps, {wall_total:.1f}s wall clock."]
+
+    # Targets (all phases of a target summed, e.g. both xelatex passes)
+    targets = defaultdict(lambda: {"wall": 0.0, "cpu": 0.0, "rss": 0, "size": None, "steps": 0})
+    for e in events:
+        t = targets[e["target"]]
+        t["wall"] += e["end"] - e["start"]
+        t["cpu"] += e.get("cpu") or 0
+        t["rss"] = max(t["rss"], e.get("max_rss_kb") or 0)
+        t["size"] = e.get("output_size") if e.get("output_size") is not None else t["size"]
+        t["steps"] += 1
+    rows = [
+        (name, t["steps"], f"{t['wall']:.2f}", f"{t['cpu']:.2f}", format_size(t["rss"] * 1024), format_size(t["size"]))
+        for name, t in sorted(targets.items(), key=lambda kv: kv[1]["wall"], reverse=True)[:top]
+    ]
+    sections.append("Slowest targets:\n" + format_table(["target", "steps", "wall_s", "cpu_s", "peak_rss", "output"], rows))
+
+    # Phases (xelatex-1 vs xelatex-2, nbconvert, pandoc, ...)
+    phases = defaultdict(lambda: {"wall": 0.0, "cpu": 0.0, "count": 0, "max": 0.0})
+    for e in events:
+        p = phases[e["phase"]]
+        duration = e["end"] - e["start"]
+        p["wall"] += duration
+        p["cpu"] += e.get("cpu") or 0
+        p["count"] += 1
+        p["max"] = max(p["max"], duration)
+    rows = [
+        (name, p["count"], f"{p['wall']:.2f}", f"{p['cpu']:.2f}", f"{p['wall'] / p['count']:.2f}", f"{p['max']:.2f}")
+        for name, p in sorted(phases.items(), key=lambda kv: kv[1]["wall"], reverse=True)
+    ]
+    sections.append("Phases:\n" + format_table(["phase", "count", "wall_s", "cpu_s", "avg_s", "max_s"], rows))
+
+    # Images: each pass's wall time is split between its images by size (an estimate, logs have no timings).
+    images = defaultdict(lambda: {"size": 0, "passes": 0, "est": 0.0})
+    for e in events:
+        pass_images = e.get("images") or []
+        pass_bytes = sum(size for _, size in pass_images)
+        for path, size in pass_images:
+            img = images[path]
+            img["size"] = size
+            img["passes"] += 1
+            if pass_bytes:
+                img["est"] += (e["end"] - e["start"]) * size / pass_bytes
+    if images:
+        rows = [
+            (path, format_size(img["size"]), img["passes"], f"{img['est']:.2f}")
+            for path, img in sorted(images.items(), key=lambda kv: kv[1]["est"], reverse=True)[:top]
+        ]
+        sections.append(
+            "Largest included images (time estimated by size share of each xelatex pass):\n"
+            + format_table(["image", "size", "passes", "est_s"], rows)
+        )
+
+    return "\n\n".join(sections)
+
+
+def report(directory, top):
+    events = load_events(directory)
+
+    with open(os.path.join(directory, CHROME_TRACE_FILE), "w", encoding="utf-8") as f:
+        json.dump(build_chrome_trace(events), f)
+
+    summary = build_summary(events, top)
+    with open(os.path.join(directory, SUMMARY_FILE), "w", encoding="utf-8") as f:
+        f.write(summary + "\n")
+
+    print(summary)
+    print(f"\nChrome trace written to {os.path.join(directory, CHROME_TRACE_FILE)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build tracing: wrap build steps and report timings.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Run and trace a single build step")
+    run_parser.add_argument("--target", required=True, help="Make target (its size is recorded as output size)")
+    run_parser.add_argument("--phase", required=True, help="Phase name, e.g. xelatex-1, nbconvert, pandoc")
+    run_parser.add_argument("--log", help="xelatex .log to scan for included images")
+    run_parser.add_argument("cmd", nargs=argparse.REMAINDER, help="Command to run (after --)")
+
+    report_parser = subparsers.add_parser("report", help="Write the Chrome trace and print the summary")
+    report_parser.add_argument("--dir", default=None, help=f"Trace directory (default: ${TRACE_ENV} or out/.trace)")
+    report_parser.add_argument("--top", type=int, default=20, help="Rows per table (default: 20)")
+
+    args = parser.parse_args()
+
+    if args.command == "run":
+        command = args.cmd[1:] if args.cmd[:1] == ["--"] else args.cmd
+        sys.exit(run_command(args.target, args.phase, command, args.log))
+
+    directory = args.dir or trace_dir() or os.path.join("out", ".trace")
+    if not os.path.isdir(directory):
+        print(f"No trace directory found: {directory}")
+        sys.exit(1)
+    report(directory, args.top)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Statically checks that every \\input / \\include / \\includegraphics / \\importpdfpage / \\insertFullImg target exists,
+so a broken relative path fails the build in under a second instead of deep inside xelatex.
+
+Checked files:
+  src/**/*.tex                  (including the generated topic/aggregate files in src/*/bagrut_questions)
+  bagrut_questions/*/*.tex      (question solutions, created from the create_empty_sol.py stubs)
+
+Paths are resolved like the Makefile's xelatex calls resolve them: relative to the document's directory (out/ mirrors
+src/, so that is the same depth), then relative to the repo root. Question files are \\input from
+src/<subject>/bagrut_questions and other src/*/*/ documents, so their paths are resolved from there.
+Targets that exist only with different letter case are reported too (they break on case-sensitive file systems).
+
+Parsed references are cached per file (by mtime and size) in out/.check_paths_cache.json.
+
+Usage: python scripts/check_paths.py [--no-cache]
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+SCAN_GLOBS = [("src", True), ("bagrut_questions", False)]
+CACHE_FILE = os.path.join("out", ".check_paths_cache.json")
+
+# command -> extensions tried when the target has none
+COMMAND_EXTENSIONS = {
+    "input": [".tex"],
+    "include": [".tex"],
+    "includegraphics": [".pdf", ".png", ".jpg", ".jpeg", ".eps"],
+    "importpdfpage": [],
+    "insertFullImg": [".pdf", ".png", ".jpg", ".jpeg", ".eps"],
+}
+REFERENCE_PATTERN = re.compile(
+    r"\\(" + "|".join(COMMAND_EXTENSIONS) + r")\s*(?:\[[^\]]*\])?\s*\{([^{}]*)\}"
+)
+COMMENT_PATTERN = re.compile(r"(?<!\\)%.*")
+
+_listdir_cache = {}
+
+
+def find_tex_files():
+    files = []
+    for top, recursive in SCAN_GLOBS:
+        if not os.path.isdir(top):
+            continue
+        if recursive:
+            for root, _, names in os.walk(top):
+                files.extend(os.path.join(root, n) for n in names if n.endswith(".tex"))
+        else:
+            for folder in os.listdir(top):
+                folder_path = os.path.join(top, folder)
+                if os.path.isdir(folder_path):
+                    files.extend(os.path.join(folder_path, n) for n in os.listdir(folder_path) if n.endswith(".tex"))
+    return sorted(files)
+
+
+def parse_references(tex_path):
+    """Return [(line_number, command, target)] for the path references in a .tex file, ignoring comments."""
+    with open(tex_path, "r", encoding="utf-8-sig", errors="ignore") as f:
+        lines = [COMMENT_PATTERN.sub("", line) for line in f]
+
+    # Join lines so arguments spanning a line break are found; map offsets back to line numbers.
+    content = "".join(lines)
+    line_starts = []
+    offset = 0
+    for line in lines:
+        line_starts.append(offset)
+        offset += len(line)
+
+    references = []
+    line_index = 0
+    for match in REFERENCE_PATTERN.finditer(content):
+        target = match.group(2).strip()
+        # Skip macro parameters (\includegraphics{#1}) and computed paths
+        if not target or "#" in target or "\\" in target:
+            continue
+        while line_index + 1 < len(line_starts) and line_starts[line_index + 1] <= match.start():
+            line_index += 1
+        references.append((line_index + 1, match.group(1), target))
+    return references
+
+
+def base_dirs(tex_path):
+    """Directories a relative path in `tex_path` is resolved from."""
+    parts = os.path.normpath(tex_path).split(os.sep)
+    if parts[0] == "bagrut_questions" and len(parts) == 3:
+        # Included from src/<subject>/bagrut_questions (three levels deep, like every other src document)
+        return [os.path.join("src", parts[1], "bagrut_questions"), "."]
+    return [os.path.dirname(tex_path), "."]
+
+
+def listdir_cached(directory):
+    if directory not in _listdir_cache:
+        try:
+            _listdir_cache[directory] = os.listdir(directory)
+        except OSError:
+            _listdir_cache[directory] = None
+    return _listdir_cache[directory]
+
+
+def check_case(path):
+    """
+    Walk `path` component by component comparing exact names.
+    Returns ("ok", path), ("case", actual_path) or ("missing", None).
+    """
+    parts = os.path.normpath(path).split(os.sep)
+    current = "."
+    actual = []
+    mismatch = False
+    for part in parts:
+        if part in (".", ""):
+            continue
+        if part == "..":
+            current = os.path.normpath(os.path.join(current, ".."))
+            actual.append(part)
+            continue
+        entries = listdir_cached(current)
+        if entries is None:
+            return "missing", None
+        if part not in entries:
+            matches = [e for e in entries if e.lower() == part.lower()]
+            if not matches:
+                return "missing", None
+            part = matches[0]
+            mismatch = True
+        actual.append(part)
+        current = os.path.join(current, part)
+    return ("case" if mismatch else "ok"), os.path.join(*actual) if actual else "."
+
+
+def resolve(tex_path, command, target):
+    """Return (status, resolved_path) for a reference: status is "ok", "case" or "missing"."""
+    candidates = [target]
+    if not os.path.splitext(target)[1]:
+        candidates += [target + ext for ext in COMMAND_EXTENSIONS[command]]
+
+    case_match = None
+    for base in base_dirs(tex_path):
+        for candidate in candidates:
+            status, actual = check_case(os.path.normpath(os.path.join(base, candidate)))
+            if status == "ok" and os.path.isfile(actual):
+                return "ok", actual
+            if status == "case" and case_match is None:
+                case_match = actual
+    if case_match:
+        return "case", case_match
+    return "missing", None
+
+
+def load_cache(use_cache):
+    if not use_cache or not os.path.exists(CACHE_FILE):
+        return {}
+    try:
+        with open(CACHE_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_cache(cache):
+    os.makedirs(os.path.dirname(CACHE_FILE), exist_ok=True)
+    with open(CACHE_FILE, "w", encoding="utf-8") as f:
+        json.dump(cache, f)
+
+
+def collect_references(tex_files, use_cache):
+    """Return {tex_path: references}, parsing only files changed since the cached parse (in parallel)."""
+    cache = load_cache(use_cache)
+    result = {}
+    stale = []
+    for path in tex_files:
+        stat = os.stat(path)
+        key = [stat.st_mtime_ns, stat.st_size]
+        entry = cache.get(path)
+        if entry and entry["key"] == key:
+            result[path] = [tuple(r) for r in entry["refs"]]
+        else:
+            stale.append((path, key))
+
+    if stale:
+        paths = [p for p, _ in stale]
+        if len(stale) > 50:
+            with ProcessPoolExecutor() as executor:
+                parsed = list(executor.map(parse_references, paths, chunksize=16))
+        else:
+            parsed = [parse_references(p) for p in paths]
+        for (path, key), refs in zip(stale, parsed):
+            result[path] = refs
+            cache[path] = {"key": key, "refs": refs}
+
+    if use_cache:
+        save_cache({p: cache[p] for p in tex_files})
+    return result, len(stale)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that all LaTeX path references resolve.")
+    parser.add_argument("--no-cache", action="store_true", help="Re-parse every file and don't write the cache")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    tex_files = find_tex_files()
+    references, parsed_count = collect_references(tex_files, not args.no_cache)
+
+    missing = []
+    case_mismatches = []
+    total = 0
+    for tex_path in tex_files:
+        for line, command, target in references[tex_path]:
+            total += 1
+            status, actual = resolve(tex_path, command, target)
+            if status == "missing":
+                missing.append(f"{tex_path}:{line}: \\{command}{{{target}}} not found")
+            elif status == "case":
+                case_mismatches.append(f"{tex_path}:{line}: \\{command}{{{target}}} only matches {actual} (letter case differs)")
+
+    elapsed = time.perf_counter() - start
+    for problem in missing + case_mismatches:
+        print(problem, file=sys.stderr)
+
+    print(f"Checked {total} reference(s) in {len(tex_files)} file(s) ({parsed_count} parsed) in {elapsed:.2f}s: "
+          f"{len(missing)} missing, {len(case_mismatches)} case mismatch(es)")
+    if missing or case_mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
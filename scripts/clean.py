@@ -9,6 +9,9 @@ Example: python scripts/clean.py out
 import os
 import sys
 
+from build_trace import traced
+
+@traced("dclean", output=lambda base_dir: base_dir)
 def remove_duplicates(base_dir: str):
     SOLS_SUFFIX = "_sols"
     PRINTABLE_SUFFIX = "_printable"
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Optimizes the generated PDFs in place: deduplicates identical objects/streams (fonts, images), recompresses streams
+and object streams, and linearizes each file for fast first-page display. All of this is lossless.
+
+With --recompress-images, images above IMAGE_DPI_THRESHOLD are also downsampled to IMAGE_TARGET_DPI and lossy images
+(JPEG) are re-encoded at --image-quality. Lossless images (PNG scans) are never converted to JPEG.
+
+Files whose content hash matches the one recorded after their last optimization are skipped, so re-running after a
+partial rebuild only touches the PDFs that were rebuilt. Hidden directories (out/.fragments, out/.trace) are ignored.
+
+Requires PyMuPDF (fitz), the script does nothing when it is missing. Linearization uses pikepdf when it is installed
+and is skipped otherwise.
+
+Usage: python scripts/optimize_pdfs.py [directory] [--jobs N] [--recompress-images] [--image-quality Q] [--force]
+
+Example: python scripts/optimize_pdfs.py out
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from build_trace import traced
+
+try:
+    import fitz
+except ImportError:
+    fitz = None
+
+try:
+    import pikepdf
+except ImportError:
+    pikepdf = None
+
+MANIFEST_FILE = ".optimize_manifest.json"
+DEFAULT_IMAGE_QUALITY = 85
+# Images above this resolution are downsampled to IMAGE_TARGET_DPI (scans are usually 300dpi, A4 print needs ~150-200)
+IMAGE_DPI_THRESHOLD = 250
+IMAGE_TARGET_DPI = 200
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def find_pdfs(base_dir):
+    pdfs = []
+    for root, dirs, files in os.walk(base_dir):
+        dirs[:] = [d for d in dirs if not d.startswith(".")]
+        pdfs.extend(os.path.join(root, f) for f in files if f.lower().endswith(".pdf"))
+    return sorted(pdfs)
+
+
+def load_manifest(base_dir):
+    path = os.path.join(base_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(base_dir, manifest):
+    with open(os.path.join(base_dir, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+
+def optimize_pdf(path, image_quality=None):
+    """
+    Optimize one PDF in place, recompressing images only when `image_quality` is given.
+    Returns (path, size_before, size_after, new_hash, error).
+    The original is kept if optimizing fails or makes it bigger without linearizing it.
+    """
+    size_before = os.path.getsize(path)
+    tmp_path = f"{path}.optimizing"
+    try:
+        with fitz.open(path) as doc:
+            # Available in newer PyMuPDF versions only. lossless=False keeps PNG scans lossless.
+            if image_quality is not None and hasattr(doc, "rewrite_images"):
+                doc.rewrite_images(
+                    dpi_threshold=IMAGE_DPI_THRESHOLD, dpi_target=IMAGE_TARGET_DPI, quality=image_quality,
+                    lossy=True, lossless=False,
+                )
+            # garbage=4 merges identical objects and streams (repeated fonts, the same scan embedded twice)
+            doc.save(
+                tmp_path, garbage=4, deflate=True, deflate_images=True, deflate_fonts=True,
+                clean=True, use_objstms=1,
+            )
+
+        linearized = False
+        if pikepdf is not None:
+            with pikepdf.open(tmp_path, allow_overwriting_input=True) as pdf:
+                pdf.save(
+                    tmp_path, linearize=True, compress_streams=True,
+                    object_stream_mode=pikepdf.ObjectStreamMode.generate,
+                )
+            linearized = True
+
+        size_after = os.path.getsize(tmp_path)
+        if size_after > size_before and not linearized:
+            os.remove(tmp_path)
+            return path, size_before, size_before, file_hash(path), None
+
+        os.replace(tmp_path, path)
+        return path, size_before, size_after, file_hash(path), None
+    except Exception as e:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return path, size_before, size_before, None, str(e)
+
+
+def format_size(num_bytes):
+    sign = "-" if num_bytes < 0 else ""
+    num_bytes = abs(num_bytes)
+    for unit in ["B", "KB", "MB"]:
+        if num_bytes < 1024:
+            return f"{sign}{num_bytes:.0f}{unit}"
+        num_bytes /= 1024
+    return f"{sign}{num_bytes:.1f}GB"
+
+
+@traced("optimize")
+def optimize_directory(base_dir, jobs=None, image_quality=None, force=False):
+    manifest = {} if force else load_manifest(base_dir)
+    pdfs = find_pdfs(base_dir)
+
+    pending = []
+    for path in pdfs:
+        rel_path = os.path.relpath(path, base_dir)
+        if manifest.get(rel_path) == file_hash(path):
+            continue
+        pending.append(path)
+
+    print(f"Optimizing {len(pending)} of {len(pdfs)} PDF(s) in {base_dir} ({len(pdfs) - len(pending)} unchanged)")
+    if pikepdf is None:
+        print("pikepdf is not installed, skipping linearization")
+    if not pending:
+        return
+
+    total_before = total_after = 0
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        results = executor.map(optimize_pdf, pending, [image_quality] * len(pending))
+        for path, size_before, size_after, new_hash, error in results:
+            rel_path = os.path.relpath(path, base_dir)
+            if error:
+                print(f"Error optimizing {rel_path}: {error}", file=sys.stderr)
+                continue
+            manifest[rel_path] = new_hash
+            total_before += size_before
+            total_after += size_after
+            saved = size_before - size_after
+            percent = saved / size_before * 100 if size_before else 0
+            print(f"  {rel_path}: {format_size(size_before)} -> {format_size(size_after)} "
+                  f"(saved {format_size(saved)}, {percent:.1f}%)")
+
+    # Forget files that no longer exist
+    manifest = {p: h for p, h in manifest.items() if os.path.exists(os.path.join(base_dir, p))}
+    save_manifest(base_dir, manifest)
+
+    saved = total_before - total_after
+    percent = saved / total_before * 100 if total_before else 0
+    print(f"Total: {format_size(total_before)} -> {format_size(total_after)} (saved {format_size(saved)}, {percent:.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Deduplicate, recompress and linearize generated PDFs.")
+    parser.add_argument("directory", nargs="?", default="out", help="Directory to optimize (default: out)")
+    parser.add_argument("--jobs", type=int, default=None, help="Parallel workers (default: CPU count)")
+    parser.add_argument("--recompress-images", action="store_true",
+                        help=f"Downsample images above {IMAGE_DPI_THRESHOLD}dpi and re-encode JPEG images (lossy)")
+    parser.add_argument("--image-quality", type=int, default=DEFAULT_IMAGE_QUALITY,
+                        help=f"JPEG quality with --recompress-images (default: {DEFAULT_IMAGE_QUALITY})")
+    parser.add_argument("--force", action="store_true", help="Ignore the manifest and optimize every PDF")
+    args = parser.parse_args()
+
+    if fitz is None:
+        print("PyMuPDF is not installed, skipping PDF optimization")
+        return
+    if not os.path.isdir(args.directory):
+        print(f"Directory not found: {args.directory}")
+        sys.exit(1)
+    image_quality = args.image_quality if args.recompress_images else None
+    optimize_directory(args.directory, args.jobs, image_quality, args.force)
+
+
+if __name__ == "__main__":
+    main()